@@ -22,6 +22,9 @@ const RECONNECT_DELAY = 5000; // 5 seconds
 let socket = null;
 let connectionState = 'disconnected'; // disconnected | connecting | connected
 
+// Encodes responses as UTF-8 bytes (sent as binary frames)
+const encoder = new TextEncoder();
+
 // ============================================================================
 // CONNECTION MANAGEMENT
 // ============================================================================
@@ -156,6 +159,8 @@ async function executeCommand(request) {
 
 /**
  * Send response back to server
+ * Sent as a binary frame so the server can skip UTF-8 validation of the
+ * frame and parse the JSON bytes directly
  * @param {string} id - Request ID
  * @param {boolean} success - Success status
  * @param {*} data - Response data or error message
@@ -163,7 +168,7 @@ async function executeCommand(request) {
 function sendResponse(id, success, data) {
 	if (socket?.readyState === WebSocket.OPEN) {
 		const response = { id, success, data };
-		socket.send(JSON.stringify(response));
+		socket.send(encoder.encode(JSON.stringify(response)));
 	}
 }
 
@@ -15,21 +15,43 @@ Company: Infoproject LLC
 License: MIT
 
 Requirements:
-    pip install websockets aiohttp
+    pip install websockets
+
+Optional (faster event loop and JSON, uvloop not available on Windows):
+    pip install uvloop orjson
 
 Usage:
     python3 chromix-three-server.py
 """
 
 import asyncio
+import itertools
 import json
+import logging
+import logging.handlers
+import queue
 import signal
 import sys
-from datetime import datetime
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, NamedTuple, Union
 
 import websockets
-from aiohttp import web
+
+# Use orjson for JSON parsing/serialization if available (C implementation),
+# fall back to stdlib json otherwise. Parse errors are caught as ValueError:
+# it covers JSONDecodeError from both, and UnicodeDecodeError raised by
+# stdlib json for invalid UTF-8 bytes.
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        """Serialize object to compact JSON bytes (same output as orjson)."""
+        return json.dumps(obj, separators=(',', ':')).encode()
 
 # ============================================================================
 # CONFIGURATION
@@ -44,20 +66,139 @@ WS_PORT = 7444
 # Request timeout in seconds
 REQUEST_TIMEOUT = 10.0
 
+# Log level (logging.DEBUG also logs every command received)
+LOG_LEVEL = logging.INFO
+
+# Maximum number of requests queued for sending to the extension
+OUTBOUND_QUEUE_SIZE = 64
+
+# Maximum HTTP request body size in bytes
+MAX_BODY_SIZE = 1024 * 1024
+
+# Seconds an HTTP connection may stay idle or stall mid-request before it
+# is closed (same default as aiohttp)
+KEEP_ALIVE_TIMEOUT = 75.0
+
+# Maximum WebSocket message size in bytes (responses from the extension)
+WS_MAX_SIZE = 1024 * 1024
+
+# HTTP status lines for responses sent by the HTTP server
+HTTP_STATUS = {
+    200: b'200 OK',
+    400: b'400 Bad Request',
+    404: b'404 Not Found',
+    405: b'405 Method Not Allowed',
+    413: b'413 Payload Too Large',
+    500: b'500 Internal Server Error',
+}
+
+# CORS headers added to all HTTP responses (for browser testing)
+# In production, the server only accepts localhost connections
+CORS_HEADERS = (
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+    b'Access-Control-Allow-Headers: Content-Type\r\n'
+)
+
+# Pre-encoded JSON response head per status code, up to the
+# Content-Length value (status line, CORS and content type headers)
+JSON_RESPONSE_HEADS = {
+    status: (
+        b'HTTP/1.1 ' + line + b'\r\n' + CORS_HEADERS +
+        b'Content-Type: application/json\r\n'
+        b'Content-Length: '
+    )
+    for status, line in HTTP_STATUS.items()
+}
+
+# Pre-built response to CORS preflight OPTIONS requests
+PREFLIGHT_RESPONSE = (
+    b'HTTP/1.1 200 OK\r\n' + CORS_HEADERS + b'Content-Length: 0\r\n\r\n'
+)
+
+# ============================================================================
+# ERRORS
+# ============================================================================
+
+class ChromixError(Exception):
+    """Base class for expected command errors (reported to the client)."""
+
+
+class ExtensionNotConnected(ChromixError):
+    """Raised when a command is sent while no extension is connected."""
+
+
+class ExtensionDisconnected(ChromixError):
+    """Raised when the extension disconnects before responding."""
+
+
+class RequestTimeout(ChromixError):
+    """Raised when the extension does not respond within REQUEST_TIMEOUT."""
+
+
+class CommandFailed(ChromixError):
+    """Raised when the extension reports that a command failed."""
+
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+logger = logging.getLogger('chromix-three')
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Configure non-blocking logging to stdout.
+
+    Log records are put on a queue by a QueueHandler and written to stdout
+    by a QueueListener on a background thread, so logging never blocks
+    the event loop on console I/O.
+
+    Returns:
+        logging.handlers.QueueListener: Started listener (stop on exit
+                                        to flush pending records)
+    """
+    log_queue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 # ============================================================================
 # STATE
 # ============================================================================
 
+class OutboundRequest(NamedTuple):
+    """Request queued for sending to the extension."""
+
+    id: str
+    frame: str
+
+
 # Single extension WebSocket connection
 # Only one Chrome extension connects at a time (single-user design)
 extension_socket: Optional[websockets.WebSocketServerProtocol] = None
 
-# Pending request waiting for response from extension
-# Only ONE request can be pending at a time (single-user scenario)
-pending_request: Optional[Dict[str, Any]] = None
+# Pending requests waiting for response from extension, keyed by request ID
+pending: Dict[str, asyncio.Future] = {}
+
+# Outbound queue of OutboundRequest items for the current connection
+# Drained by extension_writer(), created per connection
+outbound: Optional[asyncio.Queue] = None
 
 # Request ID counter for generating unique request identifiers
-request_id_counter = 0
+request_id_counter = itertools.count(1)
+
+# Request ID format: req-{milliseconds}-{counter}
+REQUEST_ID_FORMAT = 'req-%d-%d'
 
 
 # ============================================================================
@@ -68,16 +209,16 @@ def generate_request_id() -> str:
     """
     Generate unique request ID.
 
-    Creates a unique identifier for each request using timestamp and counter.
+    Creates a unique identifier for each request using monotonic clock
+    milliseconds and counter.
     Format: req-{milliseconds}-{counter}
 
     Returns:
-        str: Unique request ID (e.g., "req-1703073600000-1")
+        str: Unique request ID (e.g., "req-86400000-1")
     """
-    global request_id_counter
-    request_id_counter += 1
-    timestamp = int(datetime.now().timestamp() * 1000)
-    return f"req-{timestamp}-{request_id_counter}"
+    return REQUEST_ID_FORMAT % (
+        time.monotonic_ns() // 1_000_000, next(request_id_counter)
+    )
 
 
 # ============================================================================
@@ -92,149 +233,288 @@ async def handle_extension_connection(
     Handle WebSocket connection from Chrome extension.
 
     Maintains a persistent connection to the Chrome extension and processes
-    incoming response messages. Only one extension connection is supported
-    at a time.
+    incoming response messages. Starts a writer task that sends queued
+    requests for the lifetime of the connection. Only one extension
+    connection is supported at a time.
 
     Args:
         websocket: WebSocket connection from the Chrome extension
         path: WebSocket connection path (unused but required by websockets API)
     """
-    global extension_socket
+    global extension_socket, outbound
 
-    print("[WebSocket] Extension connected")
+    logger.info("[WebSocket] Extension connected")
     extension_socket = websocket
+    outbound = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+    writer_task = asyncio.create_task(extension_writer(websocket, outbound))
 
     try:
         # Process incoming messages until connection closes
         async for message in websocket:
             await handle_extension_response(message)
     except websockets.exceptions.ConnectionClosed:
-        print("[WebSocket] Extension disconnected")
+        logger.info("[WebSocket] Extension disconnected")
     finally:
-        extension_socket = None
-
-        # Reject any pending request if extension disconnects
-        global pending_request
-        if pending_request:
-            pending_request['future'].set_exception(
-                Exception("Extension disconnected")
-            )
-            pending_request = None
-
-
-async def handle_extension_response(data: str) -> None:
+        writer_task.cancel()
+
+        # Only reset state if a newer connection has not taken over
+        if extension_socket is websocket:
+            extension_socket = None
+            outbound = None
+
+            # Reject all pending requests if extension disconnects
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ExtensionDisconnected("Extension disconnected")
+                    )
+            pending.clear()
+
+
+async def handle_extension_response(
+    data: Union[str, bytes],
+    _loads=json_loads,
+    _pending=pending
+) -> None:
     """
     Handle response message from Chrome extension.
 
     Parses the JSON response and resolves the pending request future.
-    Matches responses to requests using the unique request ID.
+    Matches responses to requests using the unique request ID. Responses
+    without a pending request (e.g., arriving after a timeout) are ignored.
+
+    The extension sends responses as binary frames, which websockets
+    delivers as bytes without UTF-8 validation. Invalid UTF-8 is rejected
+    by the JSON parser (JSONDecodeError with orjson, UnicodeDecodeError
+    with stdlib json, both ValueError). Text frames from older extension
+    versions are still accepted.
 
     Args:
-        data: JSON string containing response from extension
+        data: JSON bytes (or string) containing response from extension
               Expected format: {"id": "req-123", "success": bool, "data": any}
+        _loads, _pending: Globals bound as locals for faster lookup
+                          (do not pass)
     """
-    global pending_request
-
     try:
-        response = json.loads(data)
-
-        # Check if we have a pending request matching this response
-        if pending_request and pending_request['id'] == response['id']:
-            if response['success']:
-                # Resolve future with successful response
-                pending_request['future'].set_result(response)
-            else:
-                # Reject future with error
-                error_msg = response.get('data', 'Unknown error')
-                pending_request['future'].set_exception(Exception(error_msg))
-            pending_request = None
-
-    except json.JSONDecodeError as e:
-        print(f"[WebSocket] Error parsing response: {e}")
-
-
-async def send_to_extension(request: Dict[str, Any]) -> Dict[str, Any]:
+        response = _loads(data)
+    except ValueError as e:
+        logger.warning("[WebSocket] Error parsing response: %s", e)
+        return
+
+    # Response must be a JSON object with a string request ID
+    if not (isinstance(response, dict) and
+            isinstance(response.get('id'), str)):
+        logger.warning("[WebSocket] Invalid response: %.200r", response)
+        return
+
+    # Look up the pending request matching this response
+    future = _pending.pop(response['id'], None)
+    if future is None or future.done():
+        return
+
+    if response.get('success'):
+        # Resolve future with successful response
+        future.set_result(response)
+    else:
+        # Reject future with error
+        error_msg = response.get('data', 'Unknown error')
+        future.set_exception(CommandFailed(error_msg))
+
+
+async def send_to_extension(
+    request: Dict[str, Any],
+    _dumps=json_dumps,
+    _pending=pending,
+    _wait_for=asyncio.wait_for
+) -> Dict[str, Any]:
     """
     Send request to Chrome extension and wait for response.
 
     Creates a future that will be resolved when the extension sends back
-    a response message. Uses asyncio.wait_for to implement timeout.
+    a response message, and queues the request for extension_writer().
+    If the outbound queue is full, waits for space; the wait counts
+    against the request timeout. Uses asyncio.wait_for to implement
+    timeout.
 
     Args:
         request: Command request to send to extension
                  Must contain 'id' field for response matching
+        _dumps, _pending, _wait_for: Globals bound as locals for faster
+                 lookup (do not pass)
 
     Returns:
         dict: Response from extension with format:
               {"id": str, "success": bool, "data": any}
 
     Raises:
-        Exception: If extension is not connected
-        Exception: If request times out (10 seconds)
+        ExtensionNotConnected: If extension is not connected
+        ExtensionDisconnected: If extension disconnects before responding
+        CommandFailed: If extension reports an error for the command
+        RequestTimeout: If request times out (10 seconds)
     """
-    global pending_request
-
-    # Check if extension is connected
-    if not extension_socket or extension_socket.closed:
-        raise Exception("Extension not connected")
+    # Check if extension is connected (single global lookup)
+    sock = extension_socket
+    outbox = outbound
+    if sock is None or sock.closed or outbox is None:
+        raise ExtensionNotConnected("Extension not connected")
 
     # Create future for response
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + REQUEST_TIMEOUT
     future = loop.create_future()
 
     # Store pending request for response matching
-    pending_request = {
-        'id': request['id'],
-        'future': future
-    }
-
-    # Send request to extension
-    try:
-        await extension_socket.send(json.dumps(request))
+    request_id = request['id']
+    _pending[request_id] = future
 
-        # Wait for response with timeout
-        response = await asyncio.wait_for(future, timeout=REQUEST_TIMEOUT)
-        return response
+    # Request for the writer (decoded to str so the extension receives
+    # a text frame)
+    item = OutboundRequest(request_id, _dumps(request).decode())
 
+    try:
+        if outbox.full():
+            # Wait for space in the queue, or for the future to be
+            # rejected (extension disconnected), within the timeout
+            put = loop.create_task(outbox.put(item))
+            await asyncio.wait(
+                (put, future),
+                timeout=REQUEST_TIMEOUT,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not put.done():
+                put.cancel()
+                if not future.done():
+                    raise RequestTimeout("Request timeout")
+        else:
+            outbox.put_nowait(item)
+
+        # Wait for response with the remaining timeout
+        return await _wait_for(
+            future, timeout=max(deadline - loop.time(), 0)
+        )
     except asyncio.TimeoutError:
-        pending_request = None
-        raise Exception("Request timeout")
-    except Exception as e:
-        pending_request = None
-        raise e
+        raise RequestTimeout("Request timeout")
+    finally:
+        _pending.pop(request_id, None)
 
 
-def is_connected() -> bool:
+async def extension_writer(
+    websocket: websockets.WebSocketServerProtocol,
+    outbox: asyncio.Queue
+) -> None:
     """
-    Check if Chrome extension is currently connected.
+    Send queued requests to Chrome extension.
 
-    Returns:
-        bool: True if extension WebSocket is connected, False otherwise
+    Single task per connection that drains the outbound queue and writes
+    each frame to the extension WebSocket, so sends are serialized without
+    scheduling a separate send per HTTP request. Frames are not merged
+    because the extension parses one JSON request per message. Requests
+    that already timed out or were rejected are skipped. Send errors are
+    delivered to the waiting request's future.
+
+    Args:
+        websocket: WebSocket connection to the Chrome extension
+        outbox: Outbound queue of OutboundRequest items
     """
-    return extension_socket is not None and not extension_socket.closed
+    while True:
+        item = await outbox.get()
+
+        future = pending.get(item.id)
+        if future is None or future.done():
+            continue
+
+        try:
+            await websocket.send(item.frame)
+        except websockets.exceptions.ConnectionClosed:
+            if not future.done():
+                future.set_exception(
+                    ExtensionDisconnected("Extension disconnected")
+                )
+        except asyncio.CancelledError:
+            # Connection closed (CancelledError is an Exception on 3.7)
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
 
 
 # ============================================================================
 # HTTP SERVER
 # ============================================================================
 
-async def handle_status(request: web.Request) -> web.Response:
+def build_response(status: int, body: bytes) -> bytes:
     """
-    Handle GET /api/status endpoint.
+    Build raw HTTP/1.1 JSON response with CORS headers.
 
-    Returns the current connection status of the Chrome extension.
+    Args:
+        status: HTTP status code (must be in HTTP_STATUS)
+        body: Serialized JSON response body
+
+    Returns:
+        bytes: Complete HTTP response (status line, headers and body)
+    """
+    return b'%s%d\r\n\r\n%s' % (JSON_RESPONSE_HEADS[status], len(body), body)
+
+
+# Pre-built /api/status responses (only two possible values), shared by
+# all status requests
+STATUS_CONNECTED_RESPONSE = build_response(
+    200, json_dumps({'connected': True})
+)
+STATUS_DISCONNECTED_RESPONSE = build_response(
+    200, json_dumps({'connected': False})
+)
+
+
+# Pre-built responses for the common command errors (the CLI may retry
+# in a loop while the extension is down)
+NOT_CONNECTED_RESPONSE = build_response(
+    500, json_dumps({'success': False, 'error': 'Extension not connected'})
+)
+TIMEOUT_RESPONSE = build_response(
+    500, json_dumps({'success': False, 'error': 'Request timeout'})
+)
+
+
+def error_response(status: int, message: str) -> bytes:
+    """
+    Build JSON error response.
 
     Args:
-        request: HTTP request object (unused)
+        status: HTTP status code (must be in HTTP_STATUS)
+        message: Error message
 
     Returns:
-        web.Response: JSON response with format:
-                      {"connected": bool}
+        bytes: HTTP response with body {"error": message}
     """
-    return web.json_response({'connected': is_connected()})
+    return build_response(status, json_dumps({'error': message}))
 
 
-async def handle_command(request: web.Request) -> web.Response:
+async def handle_status(body: bytes) -> bytes:
+    """
+    Handle GET /api/status endpoint.
+
+    Returns the current connection status of the Chrome extension.
+
+    Args:
+        body: HTTP request body (unused)
+
+    Returns:
+        bytes: HTTP response with JSON body:
+               {"connected": bool}
+    """
+    sock = extension_socket
+    connected = sock is not None and not sock.closed
+    if connected:
+        return STATUS_CONNECTED_RESPONSE
+    return STATUS_DISCONNECTED_RESPONSE
+
+
+async def handle_command(
+    body: bytes,
+    _loads=json_loads,
+    _dumps=json_dumps
+) -> bytes:
     """
     Handle POST /api/command endpoint.
 
@@ -244,85 +524,222 @@ async def handle_command(request: web.Request) -> web.Response:
     Supported commands: reload, list, close, open, ping
 
     Args:
-        request: HTTP POST request with JSON body
-                 Expected format: {"command": str, "url": str (optional),
-                                   "scope": str (optional)}
+        body: HTTP request body with JSON command
+              Expected format: {"command": str, "url": str (optional),
+                                "scope": str (optional)}
+        _loads, _dumps: Globals bound as locals for faster lookup
+              (do not pass)
 
     Returns:
-        web.Response: JSON response from extension or error message
+        bytes: HTTP response with JSON from extension or error message
 
     HTTP Status Codes:
         200: Command executed successfully
         400: Invalid request (missing command, invalid JSON)
         500: Server error (extension disconnected, timeout, etc.)
     """
+    # Parse request body (ValueError covers JSONDecodeError and, with
+    # stdlib json, UnicodeDecodeError for invalid UTF-8)
     try:
-        # Parse request body
-        body = await request.json()
+        command = _loads(body)
+    except ValueError:
+        return error_response(400, 'Invalid JSON')
 
+    # Body must be a JSON object (not a number, string or array)
+    if not isinstance(command, dict):
+        return error_response(400, 'Request body must be a JSON object')
+
+    try:
         # Validate request - command field is required
-        if 'command' not in body:
-            return web.json_response(
-                {'error': 'Missing command field'},
-                status=400
-            )
+        if 'command' not in command:
+            return error_response(400, 'Missing command field')
 
         # Generate unique request ID for response matching
-        body['id'] = generate_request_id()
+        command['id'] = generate_request_id()
 
         # Log command for debugging
-        url_part = f" ({body['url']})" if 'url' in body else ''
-        print(f"[HTTP] Command: {body['command']}{url_part}")
+        if logger.isEnabledFor(logging.DEBUG):
+            url_part = f" ({command['url']})" if 'url' in command else ''
+            logger.debug("[HTTP] Command: %s%s", command['command'], url_part)
 
         # Send to extension and wait for response
-        response = await send_to_extension(body)
+        response = await send_to_extension(command)
 
-        return web.json_response(response)
+        return build_response(200, _dumps(response))
 
-    except json.JSONDecodeError:
-        return web.json_response(
-            {'error': 'Invalid JSON'},
-            status=400
-        )
+    except ExtensionNotConnected:
+        logger.warning("[HTTP] Error: Extension not connected")
+        return NOT_CONNECTED_RESPONSE
+    except RequestTimeout:
+        logger.warning("[HTTP] Error: Request timeout")
+        return TIMEOUT_RESPONSE
     except Exception as e:
-        print(f"[HTTP] Error: {e}")
-        return web.json_response(
-            {'success': False, 'error': str(e)},
-            status=500
+        # Other typed errors are expected (extension disconnected, command
+        # failed); anything else is a bug, so log the traceback
+        if isinstance(e, ChromixError):
+            logger.warning("[HTTP] Error: %s", e)
+        else:
+            logger.exception("[HTTP] Unexpected error: %s", e)
+        return build_response(
+            500, _dumps({'success': False, 'error': str(e)})
         )
 
 
-@web.middleware
-async def handle_cors(request: web.Request, handler) -> web.Response:
+# Route table: (method, path) -> handler
+ROUTES = {
+    (b'GET', b'/api/status'): handle_status,
+    (b'POST', b'/api/command'): handle_command,
+}
+
+# Paths served by ROUTES (for 405 vs 404 responses)
+ROUTE_PATHS = {path for _, path in ROUTES}
+
+
+async def dispatch(method: bytes, path: bytes, body: bytes) -> bytes:
     """
-    CORS middleware to allow cross-origin requests.
+    Route HTTP request to its handler.
 
-    Adds CORS headers to all responses for browser testing.
-    In production, the server only accepts localhost connections.
+    HEAD requests are answered with the headers of the GET response (no
+    body). OPTIONS requests under /api/ are answered with the pre-built
+    CORS preflight response.
 
     Args:
-        request: HTTP request
-        handler: Next handler in middleware chain
+        method: HTTP method (e.g., b"GET")
+        path: Request path without query string
+        body: Request body
 
     Returns:
-        web.Response: Response with CORS headers added
+        bytes: Complete HTTP response
     """
-    # Handle preflight OPTIONS requests
-    if request.method == 'OPTIONS':
-        return web.Response(
-            headers={
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            }
-        )
+    if method == b'HEAD':
+        response = await dispatch(b'GET', path, body)
+        return response[:response.index(b'\r\n\r\n') + 4]
+
+    handler = ROUTES.get((method, path))
+    if handler is not None:
+        return await handler(body)
+
+    if method == b'OPTIONS' and path.startswith(b'/api/'):
+        return PREFLIGHT_RESPONSE
+
+    if path in ROUTE_PATHS:
+        return error_response(405, 'Method not allowed')
+    return error_response(404, 'Not found')
+
+
+def close_connection(response: bytes) -> bytes:
+    """
+    Add "Connection: close" header to HTTP response.
+
+    Used for responses after which the server closes the connection.
 
-    # Process request and add CORS headers to response
-    response = await handler(request)
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-    return response
+    Args:
+        response: Complete HTTP response
+
+    Returns:
+        bytes: Response with "Connection: close" after the status line
+    """
+    status_line, _, rest = response.partition(b'\r\n')
+    return status_line + b'\r\nConnection: close\r\n' + rest
+
+
+async def handle_http_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter
+) -> None:
+    """
+    Handle HTTP connection from CLI/script.
+
+    Minimal HTTP/1.1 server for the two API endpoints: reads the request
+    head and Content-Length body, dispatches it and writes the response.
+    Keep-alive connections are served until the client closes them,
+    sends "Connection: close" or stays idle for KEEP_ALIVE_TIMEOUT;
+    responses after which the server closes the connection carry
+    "Connection: close". "Expect: 100-continue" is answered before the
+    body is read. Chunked request bodies are not supported.
+
+    Args:
+        reader: Stream reader for the client connection
+        writer: Stream writer for the client connection
+    """
+    try:
+        while True:
+            # Read request line and headers
+            try:
+                head = await asyncio.wait_for(
+                    reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT
+                )
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                # Client closed connection or stayed idle
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(close_connection(
+                    error_response(400, 'Request headers too large')
+                ))
+                break
+
+            request_line, _, header_block = head[:-4].partition(b'\r\n')
+            parts = request_line.split()
+            if len(parts) != 3:
+                writer.write(close_connection(
+                    error_response(400, 'Malformed request line')
+                ))
+                break
+            method, target, version = parts
+            path = target.split(b'?', 1)[0]
+
+            headers = {}
+            for line in header_block.split(b'\r\n'):
+                name, _, value = line.partition(b':')
+                headers[name.strip().lower()] = value.strip()
+
+            if b'transfer-encoding' in headers:
+                writer.write(close_connection(
+                    error_response(400, 'Chunked body not supported')
+                ))
+                break
+
+            # Read request body
+            try:
+                length = int(headers.get(b'content-length', 0))
+            except ValueError:
+                writer.write(close_connection(
+                    error_response(400, 'Invalid Content-Length')
+                ))
+                break
+            if length < 0 or length > MAX_BODY_SIZE:
+                writer.write(close_connection(
+                    error_response(413, 'Request body too large')
+                ))
+                break
+            body = b''
+            if length:
+                # Tell client to send the body (e.g., curl with large -d)
+                expect = headers.get(b'expect', b'').lower()
+                if expect == b'100-continue':
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                body = await asyncio.wait_for(
+                    reader.readexactly(length), KEEP_ALIVE_TIMEOUT
+                )
+
+            # HTTP/1.1 defaults to keep-alive, HTTP/1.0 to close
+            connection = headers.get(b'connection', b'').lower()
+            keep_alive = version == b'HTTP/1.1' and connection != b'close'
+
+            response = await dispatch(method, path, body)
+            if not keep_alive:
+                response = close_connection(response)
+            writer.write(response)
+            await writer.drain()
+
+            if not keep_alive:
+                break
+
+    except (ConnectionError, asyncio.IncompleteReadError,
+            asyncio.TimeoutError):
+        pass
+    finally:
+        writer.close()
 
 
 # ============================================================================
@@ -340,35 +757,37 @@ async def main() -> None:
     Both servers bind to localhost only for security.
     """
     # Start WebSocket server for Chrome extension connection
+    # Compression is disabled: permessage-deflate only costs CPU on
+    # localhost, and declining it here disables it for both directions
     ws_server = await websockets.serve(
         handle_extension_connection,
         'localhost',
-        WS_PORT
+        WS_PORT,
+        compression=None,
+        max_size=WS_MAX_SIZE
+    )
+    logger.info("[WebSocket] Server listening on port %d", WS_PORT)
+
+    # Start HTTP server for CLI commands
+    http_server = await asyncio.start_server(
+        handle_http_connection,
+        'localhost',
+        HTTP_PORT
+    )
+
+    logger.info("[HTTP] Server listening on port %d", HTTP_PORT)
+    logger.info(
+        "\n"
+        "Chromix Three Server is running!\n"
+        "\n"
+        "Usage:\n"
+        "  curl -X POST http://localhost:8444/api/command \\\n"
+        "    -H \"Content-Type: application/json\" \\\n"
+        "    -d '{\"command\":\"reload\",\"url\":\"localhost:3000\"}'\n"
+        "\n"
+        "Status:\n"
+        "  curl http://localhost:8444/api/status\n"
     )
-    print(f"[WebSocket] Server listening on port {WS_PORT}")
-
-    # Create HTTP server for CLI commands
-    app = web.Application(middlewares=[handle_cors])
-    app.router.add_get('/api/status', handle_status)
-    app.router.add_post('/api/command', handle_command)
-
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, 'localhost', HTTP_PORT)
-    await site.start()
-
-    print(f"[HTTP] Server listening on port {HTTP_PORT}")
-    print("")
-    print("Chromix Three Server is running!")
-    print("")
-    print("Usage:")
-    print("  curl -X POST http://localhost:8444/api/command \\")
-    print("    -H \"Content-Type: application/json\" \\")
-    print("    -d '{\"command\":\"reload\",\"url\":\"localhost:3000\"}'")
-    print("")
-    print("Status:")
-    print("  curl http://localhost:8444/api/status")
-    print("")
 
     # Keep running indefinitely
     await asyncio.Future()
@@ -384,8 +803,7 @@ def shutdown(signum: int, frame) -> None:
         signum: Signal number
         frame: Current stack frame (unused)
     """
-    print("")
-    print("[Server] Shutting down...")
+    logger.info("\n[Server] Shutting down...")
     sys.exit(0)
 
 
@@ -397,18 +815,32 @@ if __name__ == '__main__':
     # Check if required dependencies are installed
     try:
         import websockets
-        import aiohttp
     except ImportError as e:
         print("Error: Missing required dependencies")
         print("")
         print("Install with:")
-        print("  pip3 install websockets aiohttp")
+        print("  pip3 install websockets")
         print("")
         sys.exit(1)
 
+    # Use uvloop event loop if available, fall back to stdlib asyncio
+    run = asyncio.run
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        if hasattr(uvloop, 'run'):
+            run = uvloop.run
+        else:
+            # uvloop < 0.18 has no run(), install its event loop policy
+            uvloop.install()
+
     # Run server
+    log_listener = setup_logging()
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
-        print("")
-        print("[Server] Stopped")
+        logger.info("\n[Server] Stopped")
+    finally:
+        log_listener.stop()
@@ -38,11 +38,11 @@ if pgrep -f "chromix-three-server.py" > /dev/null; then
 fi
 
 # Check if required Python packages are installed
-if ! python3 -c "import websockets, aiohttp" 2>/dev/null; then
+if ! python3 -c "import websockets" 2>/dev/null; then
 	echo "Error: Required Python packages not installed"
 	echo ""
 	echo "Install with:"
-	echo "  pip3 install websockets aiohttp"
+	echo "  pip3 install websockets"
 	echo ""
 	exit 1
 fi
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Chromix Three Server - HTTP Server Tests.
+
+Exercises the minimal HTTP/1.1 server in chromix-three-server.py over raw
+sockets: request line and header parsing, Content-Length bodies,
+keep-alive, HEAD, Expect: 100-continue, idle timeout and error responses.
+No Chrome extension is needed (the server reports it as not connected).
+
+Author: Vanco Ordanoski <vordan@infoproject.biz>
+Company: Infoproject LLC
+License: MIT
+
+Requirements:
+    pip install websockets
+
+Usage:
+    python3 test-http-server.py
+"""
+
+import asyncio
+import importlib.util
+import os
+import unittest
+
+# Load server module (file name is not importable as a module name)
+SERVER_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'chromix-three-server.py'
+)
+spec = importlib.util.spec_from_file_location('chromix_server', SERVER_FILE)
+server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(server)
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+async def read_response(reader: asyncio.StreamReader, head_only: bool = False):
+    """
+    Read one HTTP response from the stream.
+
+    Args:
+        reader: Stream reader for the client connection
+        head_only: Do not read a body (response to HEAD request)
+
+    Returns:
+        tuple: (status code, headers dict with lowercase names, body bytes)
+    """
+    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 2)
+    status_line, _, header_block = head[:-4].partition(b'\r\n')
+    headers = {}
+    for line in header_block.split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        headers[name.strip().lower()] = value.strip()
+
+    body = b''
+    length = int(headers.get(b'content-length', 0))
+    if length and not head_only:
+        body = await asyncio.wait_for(reader.readexactly(length), 2)
+    return int(status_line.split()[1]), headers, body
+
+
+def run_with_server(test):
+    """
+    Run coroutine test(host, port) against an HTTP server on a free port.
+
+    Args:
+        test: Coroutine function taking (host, port)
+    """
+    async def runner():
+        # Track connection handlers so they can finish before the loop ends
+        handlers = []
+
+        async def handle(reader, writer):
+            handlers.append(asyncio.current_task())
+            await server.handle_http_connection(reader, writer)
+
+        http_server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        host, port = http_server.sockets[0].getsockname()[:2]
+        try:
+            await test(host, port)
+        finally:
+            http_server.close()
+            await http_server.wait_closed()
+            if handlers:
+                await asyncio.wait(handlers, timeout=2)
+
+    asyncio.run(runner())
+
+
+# ============================================================================
+# TESTS
+# ============================================================================
+
+class HttpServerTest(unittest.TestCase):
+    """Tests for handle_http_connection() and dispatch()."""
+
+    def request(self, raw: bytes, head_only: bool = False):
+        """Send raw request on a new connection and return the response."""
+        result = []
+
+        async def test(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(raw)
+            result.append(await read_response(reader, head_only))
+            writer.close()
+
+        run_with_server(test)
+        return result[0]
+
+    def test_status(self):
+        status, headers, body = self.request(
+            b'GET /api/status HTTP/1.1\r\nHost: x\r\n\r\n'
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"connected":false}')
+        self.assertEqual(headers[b'content-type'], b'application/json')
+        self.assertEqual(headers[b'access-control-allow-origin'], b'*')
+
+    def test_status_query_string(self):
+        status, _, _ = self.request(b'GET /api/status?x=1 HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 200)
+
+    def test_head_has_no_body(self):
+        async def test(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'HEAD /api/status HTTP/1.1\r\n\r\n')
+            status, headers, _ = await read_response(reader, head_only=True)
+            self.assertEqual(status, 200)
+            self.assertEqual(headers[b'content-length'], b'19')
+
+            # Next response on the same connection must start cleanly
+            writer.write(b'GET /api/status HTTP/1.1\r\n\r\n')
+            status, _, body = await read_response(reader)
+            self.assertEqual(status, 200)
+            self.assertEqual(body, b'{"connected":false}')
+            writer.close()
+
+        run_with_server(test)
+
+    def test_keep_alive(self):
+        async def test(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            for _ in range(3):
+                writer.write(b'GET /api/status HTTP/1.1\r\n\r\n')
+                status, headers, _ = await read_response(reader)
+                self.assertEqual(status, 200)
+                self.assertNotIn(b'connection', headers)
+            writer.close()
+
+        run_with_server(test)
+
+    def test_http10_closes_connection(self):
+        async def test(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'GET /api/status HTTP/1.0\r\n\r\n')
+            _, headers, _ = await read_response(reader)
+            self.assertEqual(headers[b'connection'], b'close')
+            self.assertEqual(await asyncio.wait_for(reader.read(), 2), b'')
+
+        run_with_server(test)
+
+    def test_command_not_connected(self):
+        body = b'{"command":"ping"}'
+        status, _, response = self.request(
+            b'POST /api/command HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s'
+            % (len(body), body)
+        )
+        self.assertEqual(status, 500)
+        self.assertEqual(
+            response,
+            b'{"success":false,"error":"Extension not connected"}'
+        )
+
+    def test_command_bad_bodies(self):
+        for body in (b'{x', b'\xff\xfe', b'5', b'[1]', b'{}'):
+            status, _, _ = self.request(
+                b'POST /api/command HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s'
+                % (len(body), body)
+            )
+            self.assertEqual(status, 400, body)
+
+    def test_expect_100_continue(self):
+        async def test(host, port):
+            body = b'{"command":"ping"}'
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                b'POST /api/command HTTP/1.1\r\n'
+                b'Content-Length: %d\r\n'
+                b'Expect: 100-continue\r\n\r\n' % len(body)
+            )
+            status, _, _ = await read_response(reader)
+            self.assertEqual(status, 100)
+
+            writer.write(body)
+            status, _, _ = await read_response(reader)
+            self.assertEqual(status, 500)
+            writer.close()
+
+        run_with_server(test)
+
+    def test_not_found(self):
+        status, _, _ = self.request(b'GET /nope HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 404)
+
+    def test_method_not_allowed(self):
+        status, _, _ = self.request(b'GET /api/command HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 405)
+
+    def test_preflight(self):
+        status, headers, body = self.request(
+            b'OPTIONS /api/command HTTP/1.1\r\n\r\n'
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'')
+        self.assertIn(b'access-control-allow-methods', headers)
+
+    def test_malformed_request_line(self):
+        status, headers, _ = self.request(b'GARBAGE\r\n\r\n')
+        self.assertEqual(status, 400)
+        self.assertEqual(headers[b'connection'], b'close')
+
+    def test_invalid_content_length(self):
+        status, headers, _ = self.request(
+            b'POST /api/command HTTP/1.1\r\nContent-Length: x\r\n\r\n'
+        )
+        self.assertEqual(status, 400)
+        self.assertEqual(headers[b'connection'], b'close')
+
+    def test_body_too_large(self):
+        status, headers, _ = self.request(
+            b'POST /api/command HTTP/1.1\r\nContent-Length: %d\r\n\r\n'
+            % (server.MAX_BODY_SIZE + 1)
+        )
+        self.assertEqual(status, 413)
+        self.assertEqual(headers[b'connection'], b'close')
+
+    def test_chunked_rejected(self):
+        status, _, _ = self.request(
+            b'POST /api/command HTTP/1.1\r\n'
+            b'Transfer-Encoding: chunked\r\n\r\n'
+        )
+        self.assertEqual(status, 400)
+
+    def test_idle_connection_closed(self):
+        async def test(host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            self.assertEqual(await asyncio.wait_for(reader.read(), 2), b'')
+            writer.close()
+
+        timeout = server.KEEP_ALIVE_TIMEOUT
+        server.KEEP_ALIVE_TIMEOUT = 0.2
+        try:
+            run_with_server(test)
+        finally:
+            server.KEEP_ALIVE_TIMEOUT = timeout
+
+
+if __name__ == '__main__':
+    unittest.main()